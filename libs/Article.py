@@ -1,12 +1,21 @@
+import hashlib
 import logging
 import re
-import urllib.request
+import shutil
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from selenium.webdriver.common.by import By
-from selenium.webdriver.remote.webelement import WebElement
-from selenium.common.exceptions import NoSuchElementException
-from pandas import Timestamp
+from urllib.parse import urljoin
+import urllib3
+from lxml import etree
+
+
+# Matches $11.1 or $111,111.11, 11 dollars and 11 USD
+_MONEY_RE = re.compile(r"\$\s?[\d,]+\.\d+|\b\d+\s*dollars\b|\b\d+\s*USD\b", re.IGNORECASE)
+
+# Captures the image id of Google thumbnail URLs, e.g. https://encrypted-tbn0.gstatic.com/images?q=tbn:ANd9Gc...
+_TBN_RE = re.compile(r"[?&]q=tbn:(?P<name>[\w-]+)")
+
 
 class Article:
     """
@@ -14,12 +23,14 @@ class Article:
 
     Attributes
     ----------
-    element : WebElement
-        The article web element extracted from the page.
+    element : etree._Element
+        The article element, parsed from the outer HTML of the article web element.
     search_term : str
         The search term used to find the article.
     output_dir : Path
         The directory where article-related files are saved.
+    http : urllib3.PoolManager
+        The HTTP connection pool used to download the article's image.
     title : str
         The title of the article.
     date : datetime
@@ -37,67 +48,106 @@ class Article:
 
     Methods
     -------
+    parse_date(element: etree._Element) -> datetime | None:
+        Parses the publication date of an article element without building the article.
     download_image():
         Downloads the article's image to the specified output directory.
     """
 
-    def __init__(self, element: WebElement, search_term: str, output_dir: Path):
+    _XP_DATE = etree.XPath(
+        ".//footer/div/div[@class='gc__date gc__date--published']/div/div/span[@aria-hidden='true']"
+    )
+    _XP_TITLE = etree.XPath(".//h3[@class='gc__title']/a[@class='u-clickable-card__link']")
+    _XP_DESC = etree.XPath(".//div[@class='gc__excerpt']/p")
+    _XP_IMG = etree.XPath(".//img/@src")
+
+    def __init__(
+        self, element: etree._Element, search_term: str, output_dir: Path, http: urllib3.PoolManager | None = None
+    ):
         """
-        Initializes an Article object and extracts relevant information from the web element.
+        Initializes an Article object and extracts relevant information from the article element.
 
         Parameters
         ----------
-        element : WebElement
-            The web element representing the article.
+        element : etree._Element
+            The article element, parsed from the outer HTML of the article web element.
         search_term : str
             The search term used to find the article.
         output_dir : Path
             The directory where the article's image will be saved.
+        http : urllib3.PoolManager, optional
+            The HTTP connection pool used to download the image, shared between articles so connections
+            are reused. A new pool is created if not provided.
         """
 
         self.element = element
         self.search_term = search_term
         self.output_dir = output_dir
+        self.http = http or urllib3.PoolManager()
         self.logger = logging.getLogger(__name__)
         self.title = self._parse_title()
-        self.date = self._parse_date()
+        self.date = self.parse_date(element)
         self.description = self._parse_description()
         self.image_url, self.image_file_name = self._parse_image_url()
         self.matches_count = self._count_matches()
         self.has_money = self._find_money_mentions()
 
 
-    def _parse_date(self) -> datetime | None:
+    @classmethod
+    def parse_date(cls, element: etree._Element) -> datetime | None:
         """
-        Extracts and parses the article's publication date from the web element.
+        Extracts and parses the publication date from an article element.
+
+        This only reads the date, so it can be used to discard an article before building it.
+
+        Parameters
+        ----------
+        element : etree._Element
+            The article element, parsed from the outer HTML of the article web element.
 
         Returns
         -------
         datetime | None
             The parsed date of the article, or None if the date could not be found.
         """
-        date_xpath = ".//footer/div/div[@class='gc__date gc__date--published']/div/div/span[@aria-hidden='true']"
-        date_element = self._get_web_element(date_xpath, parent=self.element)
-        date_text = date_element.text if date_element else None
+        date_text = cls._get_text(element, cls._XP_DATE)
         if date_text:
-            date_text = date_text.replace("Last update", "").strip().rstrip()
-            date = datetime.strptime(date_text, "%d %b %Y")
-            return date
+            return cls._parse_date_text(date_text)
+
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _parse_date_text(date_text: str) -> datetime:
+        """
+        Parses a date as displayed in the article card (e.g. '10 Oct 2024' or 'Last update 10 Oct 2024').
+
+        Results are memoized: articles of a search sorted by date mostly share a handful of dates,
+        and strptime is slow compared to a cache hit.
+
+        Parameters
+        ----------
+        date_text : str
+            The date text of the article.
+
+        Returns
+        -------
+        datetime
+            The parsed date.
+        """
+        date_text = date_text.replace("Last update", "").strip()
+        return datetime.strptime(date_text, "%d %b %Y")
 
 
     def _parse_title(self) -> str | None:
         """
-        Extracts the title of the article from the web element.
+        Extracts the title of the article from the article element.
 
         Returns
         -------
         str | None
             The title of the article, or None if not found.
         """
-        title_xpath = ".//h3[@class='gc__title']/a[@class='u-clickable-card__link']"
-        title_element = self._get_web_element(title_xpath, self.element)
-        title = title_element.text if title_element else None
-        return title
+        return self._get_text(self.element, self._XP_TITLE)
     
 
     def _parse_description(self) -> str | None:
@@ -109,28 +159,32 @@ class Article:
         str | None
             The description of the article, or None if not found.
         """
-        description_xpath = ".//div[@class='gc__excerpt']/p"
-        description_element = self._get_web_element(description_xpath, self.element)
-        description = description_element.text if description_element else None
-        return description
+        return self._get_text(self.element, self._XP_DESC)
 
 
     def _parse_image_url(self) -> tuple[str | None, str | None]:
         """
         Extracts the image URL and file name from the article.
 
+        The file name is the thumbnail id of the image URL, or a hash of the whole URL for other images,
+        so the same image always gets the same file name and different images never share one.
+
         Returns
         -------
         tuple[str | None, str | None]
             A tuple containing the image URL and the image file name, or (None, None) if the image is not found.
         """
-        image_xpath = ".//img"
-        image_element = self._get_web_element(image_xpath, self.element)
-        if not image_element:
+        image_sources = self._XP_IMG(self.element)
+        if not image_sources:
             return None, None
 
-        image_url = image_element.get_attribute("src")
-        image_name = str(Timestamp.now().timestamp()).replace(".", "_")
+        # Relative sources are resolved against the page the article was parsed from
+        image_url = urljoin(self.element.base or "", image_sources[0])
+        match = _TBN_RE.search(image_url)
+        if match:
+            image_name = match.group("name")
+        else:
+            image_name = hashlib.sha1(image_url.encode("utf-8")).hexdigest()
         image_file_name = f"{image_name}.jpeg"
         return image_url, image_file_name
 
@@ -144,12 +198,7 @@ class Article:
         int
             The number of times the search term appears in the title and description.
         """
-        counter = 0
-        if self.title:
-            counter += self.title.lower().count(self.search_term.lower())
-        if self.description:
-            counter += self.description.lower().count(self.search_term.lower())
-        return counter
+        return self._join_title_and_description().lower().count(self.search_term.lower())
     
 
     def _find_money_mentions(self) -> bool:
@@ -166,69 +215,47 @@ class Article:
         bool
             True if the article mentions money, False otherwise.
         """
-        patterns = [
-            r"\$\s?[\d,]+\.\d+",  # Matches $11.1 or $111,111.11
-            r"\b\d+\s*dollars\b",  # Matches 11 dollars
-            r"\b\d+\s*USD\b",  # Matches 11 USD
-        ]
-
-        for pattern in patterns:
-            if self.title and re.search(pattern, self.title, re.IGNORECASE):
-                return True
-            if self.description and re.search(pattern, self.description, re.IGNORECASE):
-                return True
-
-        return False
-
-    def _get_web_element(
-        self, locator: str, parent: WebElement, locator_type: str = "xpath", multiple: bool = False
-    ) -> WebElement | list[WebElement]:
+        return _MONEY_RE.search(self._join_title_and_description()) is not None
+
+
+    def _join_title_and_description(self) -> str:
         """
-        Retrieves a web element or elements within the article element.
+        Joins the title and description of the article so they can be scanned in a single pass.
 
-        Parameters
-        ----------
-        locator : str
-            The locator string to identify the web element.
-        parent : WebElement
-            The parent web element (i.e., the article container).
-        locator_type : str, optional
-            The type of locator to use ('xpath', 'id', 'class', 'name', or 'css'), default is 'xpath'.
-        multiple : bool, optional
-            If True, returns a list of elements, default is False.
+        The fields are separated by a NUL character, which neither the money pattern nor a search term
+        can match, so a match never spans both fields.
 
         Returns
         -------
-        WebElement | list[WebElement]
-            The web element(s) found, or None if not found.
+        str
+            The title and description joined, leaving out the missing ones.
+        """
+        return "\x00".join(filter(None, (self.title, self.description)))
+
 
-        Raises
-        ------
-        ValueError
-            If an unsupported locator type is provided.
+    @staticmethod
+    def _get_text(element: etree._Element, xpath: etree.XPath) -> str | None:
         """
+        Retrieves the text of the first element matching the XPath within the article element.
 
-        if multiple:
-            method_to_use = parent.find_elements
-        else:
-            method_to_use = parent.find_element
+        Whitespace is collapsed so the text matches what is displayed on the page.
 
-        try:
-            if locator_type == "id":
-                return method_to_use(By.ID, locator)
-            elif locator_type == "xpath":
-                return method_to_use(By.XPATH, locator)
-            elif locator_type == "name":
-                return method_to_use(By.NAME, locator)
-            elif locator_type == "class":
-                return method_to_use(By.CLASS_NAME, locator)
-            elif locator_type == "css":
-                return method_to_use(By.CSS_SELECTOR, locator)
-            else:
-                raise ValueError(f"Locator type '{locator_type}' not supported.")
-        except NoSuchElementException:
-            self.logger.error(f"Element with locator '{locator}' not found.")
+        Parameters
+        ----------
+        element : etree._Element
+            The article element to search within.
+        xpath : etree.XPath
+            The precompiled XPath locating the element.
+
+        Returns
+        -------
+        str | None
+            The text of the element, or None if not found.
+        """
+        elements = xpath(element)
+        if not elements:
             return None
+        return " ".join("".join(elements[0].itertext()).split())
 
 
     def __str__(self) -> str:
@@ -248,10 +275,35 @@ class Article:
         Downloads the article's image to the output directory.
 
         If the image URL is found, it will be saved to the output directory with the generated file name.
+        Images already downloaded, by a previous run for instance, are not downloaded again. The image is
+        written to a temporary file, moved in place only once the download is complete.
         """
         if not self.image_url:
             return
 
         image_file = self.output_dir / self.image_file_name
-        self.logger.info(f"Downloading image: {self.image_url}")
-        urllib.request.urlretrieve(self.image_url, image_file)
+        if image_file.exists():
+            self.logger.info("Image already downloaded: %s", image_file)
+            return
+
+        self.logger.info("Downloading image: %s", self.image_url)
+        response = self.http.request("GET", self.image_url, preload_content=False)
+        try:
+            if response.status != 200:
+                # Don't save the error page as the image
+                self.logger.error("Could not download image %s: HTTP status %s", self.image_url, response.status)
+                response.drain_conn()
+                return
+
+            part_file = image_file.with_name(f"{image_file.name}.part")
+            try:
+                with open(part_file, "wb") as file:
+                    shutil.copyfileobj(response, file, length=64 * 1024)
+            except BaseException:
+                # Don't leave a partial image behind
+                part_file.unlink(missing_ok=True)
+                raise
+            part_file.replace(image_file)
+        finally:
+            # Closing the response would drop the connection, releasing it returns it to the pool
+            response.release_conn()
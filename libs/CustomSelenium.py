@@ -1,25 +1,39 @@
 
+import atexit
 import logging
 from selenium import webdriver
 from pathlib import Path
 from RPA.core.webdriver import start
-from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+
+# URL patterns of the web fonts, blocked in the browser. The trailing wildcard also matches query strings,
+# and .woff2 files
+_BLOCKED_URLS = ["*.woff*", "*.ttf*", "*.otf*"]
 
 
 class CustomSelenium:
     """
     Custom Selenium wrapper class for controlling browsers and interacting with web elements.
+
+    Browsers released with driver_quit are kept alive in a pool shared by all instances (up to
+    _driver_pool_size of them) and reused by the next set_webdriver call, avoiding a browser cold start.
     """
+    _driver_pool: list[WebDriver] = []
+    _driver_pool_size = 1
+
     def __init__(self):
         """
         Initializes the CustomSelenium class, setting up logging, the default output directory, 
-        and browser user agent.
+        browser window size and user agent.
         """
         self.driver = None
         self.logger = logging.getLogger(__name__)
         self.clogger = logging.getLogger(str(self))
         self.output_dir = Path(__file__).parent
         self.implicit_wait = 10
+        self.window_size = (1920, 1080)
         self.user_agent = (
             "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36"
         )
@@ -51,17 +65,26 @@ class CustomSelenium:
             Configured Chrome options object.
         """
         options = webdriver.ChromeOptions()
-        options.add_argument('--headless') # No UI
+        options.add_argument("--headless=new")  # No UI, with the same engine as the headed browser
         options.add_argument("--no-sandbox")  # Bypass OS security model
         options.add_argument("--disable-extensions")  # Disable extensions
         options.add_argument("--disable-gpu")  # applicable to windows os only
         options.add_argument("--disable-web-security")  # Disable web security
-        options.add_argument("--start-maximized")  # Start maximized
+        # Headless windows have no frame, so the window size is also the page size
+        options.add_argument(f"--window-size={self.window_size[0]},{self.window_size[1]}")
         options.add_argument(f"--user-agent={self.user_agent}")  # Set user agent
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option("excludeSwitches", ["enable-logging"])
+        options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
         options.add_experimental_option("useAutomationExtension", False)
-        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-dev-shm-usage")  # Use /tmp instead of the small /dev/shm
+        options.add_argument("--blink-settings=imagesEnabled=false")  # Don't render images
+        # Skip background work that a headless scraping session doesn't need
+        options.add_argument("--disable-background-networking")
+        options.add_argument("--disable-sync")
+        options.add_argument("--metrics-recording-only")
+        options.add_argument("--no-first-run")
+        options.add_argument("--disable-default-apps")
+        # Don't load images in the browser, they are downloaded separately from their URLs
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
         return options
 
 
@@ -85,14 +108,25 @@ class CustomSelenium:
         else:
             raise NotImplementedError(f"{browser} browser not implemented yet. Please use Chrome.")
 
-        self.driver = start(browser, options=options)
-        self.logger.info(f"Browser set to '{browser}' and initialized.")
+        try:
+            self.driver = self._driver_pool.pop()
+            # The pooled browser was launched with the options of another instance, apply the ones of this one
+            self.driver.set_window_size(*self.window_size)
+            self.driver.execute_cdp_cmd("Network.setUserAgentOverride", {"userAgent": self.user_agent})
+            self.logger.info(f"Browser set to '{browser}', reusing a pooled browser.")
+        except IndexError:
+            self.driver = start(browser, options=options)
+            self.logger.info(f"Browser set to '{browser}' and initialized.")
 
         # Let's give 15 seconds for the pages to load so we can avoid spurious errors such as
         # NoSuchElementException, TimeoutException, ElementNotVisibleException, ElementNotSelectableException,
         # ElementClickInterceptedException, ElementNotInteractableException
         self.set_implicit_wait(self.implicit_wait)
 
+        # Web fonts only change how the text looks, so skip downloading them
+        self.driver.execute_cdp_cmd("Network.enable", {})
+        self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": _BLOCKED_URLS})
+
         # Changes 'webdriver' variable to undefined to avoid detection by websites
         self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
 
@@ -111,10 +145,10 @@ class CustomSelenium:
         # Extract the current window size from the driver
         current_window_size = self.driver.get_window_size()
 
-        # Extract the client window size from the html tag
-        html = self.driver.find_element(By.TAG_NAME, "html")
-        inner_width = int(html.get_attribute("clientWidth"))
-        inner_height = int(html.get_attribute("clientHeight"))
+        # Extract the client window size from the html tag in a single call
+        inner_width, inner_height = self.driver.execute_script(
+            "return [document.documentElement.clientWidth, document.documentElement.clientHeight];"
+        )
 
         # "Internal width you want to set+Set "outer frame width" to window size
         target_width = width + (current_window_size["width"] - inner_width)
@@ -138,13 +172,122 @@ class CustomSelenium:
             self.driver.get_screenshot_as_file(self.output_dir / screenshot)
 
 
+    def count_elements(self, css: str, parent: WebElement = None) -> int:
+        """
+        Counts the elements matching a CSS selector in the browser, without transferring the elements.
+
+        Parameters
+        ----------
+        css : str
+            CSS selector of the elements to count.
+        parent : WebElement, optional
+            The parent element to search within, default is None (the whole page).
+
+        Returns
+        -------
+        int
+            The number of elements found.
+        """
+        return self.driver.execute_script(
+            "return (arguments[1] || document).querySelectorAll(arguments[0]).length;", css, parent
+        )
+
+
+    def get_articles_html(self, css: str, parent: WebElement = None, start: int = 0) -> str:
+        """
+        Retrieves the outer HTML of all the article elements matching a CSS selector in a single driver call.
+
+        Callers should query the whole list once and parse it in one go, instead of reading articles one by one.
+        Articles before `start` are skipped in the browser, so only the new ones are sent back by the driver.
+        The page is scrolled once, to the last article retrieved, to trigger any lazy loading.
+
+        Parameters
+        ----------
+        css : str
+            CSS selector of the article elements.
+        parent : WebElement, optional
+            The parent element to search within, default is None (the whole page).
+        start : int, optional
+            Index of the first article to retrieve, default is 0.
+
+        Returns
+        -------
+        str
+            The concatenated outer HTML of the article elements found, empty if there are none.
+        """
+        return self.driver.execute_script(
+            """
+            const [css, parent, start] = arguments;
+            const articles = Array.from((parent || document).querySelectorAll(css)).slice(start);
+            articles.at(-1)?.scrollIntoView();
+            return articles.map((article) => article.outerHTML).join("");
+            """,
+            css,
+            parent,
+            start,
+        )
+
+
     def driver_quit(self):
         """
-        Closes the web driver and quits the browser session.
+        Releases the web driver, returning it to the pool or quitting the browser session if the pool is full.
         """
-        if self.driver:
+        if not self.driver:
+            return
+
+        try:
+            if len(self._driver_pool) < self._driver_pool_size:
+                try:
+                    # Also checks the browser is still responsive before pooling it
+                    self._reset_tabs()
+                except Exception:
+                    # A dead or hung driver raises urllib3 errors as well as WebDriverException
+                    self.logger.warning(
+                        "Browser not responding, closing it instead of returning it to the pool.", exc_info=True
+                    )
+                    self._quit_unresponsive_driver()
+                    return
+                self._driver_pool.append(self.driver)
+                self.logger.info("Browser returned to the pool.")
+            else:
+                self.driver.quit()
+                self.logger.info("Browser closed.")
+        finally:
+            self.driver = None
+
+
+    def _quit_unresponsive_driver(self):
+        """
+        Quits the browser session of a driver that stopped responding, without raising so the error that
+        caused it is not hidden.
+        """
+        try:
             self.driver.quit()
-            self.logger.info("Browser closed.")
+        except Exception:
+            self.logger.warning("Browser session could not be quit cleanly.", exc_info=True)
+
+
+    def _reset_tabs(self):
+        """
+        Opens a blank tab and closes all the others, so the driver can be reused without the state of the
+        previous pages. Cookies are kept, so the next session doesn't need to go through the cookie banner again.
+        """
+        old_windows = self.driver.window_handles
+        self.driver.switch_to.new_window("tab")
+        new_window = self.driver.current_window_handle
+        for window in old_windows:
+            self.driver.switch_to.window(window)
+            self.driver.close()
+        self.driver.switch_to.window(new_window)
+
+
+    @classmethod
+    def quit_pooled_drivers(cls):
+        """
+        Quits the browser sessions of all pooled web drivers. Called automatically at interpreter exit.
+        """
+        while cls._driver_pool:
+            cls._driver_pool.pop().quit()
 
 
     def full_page_screenshot(self, url:str):
@@ -161,7 +304,7 @@ class CustomSelenium:
         page_height = self.driver.execute_script("return document.body.scrollHeight")
         self.driver.set_window_size(page_width, page_height)
         self.driver.save_screenshot("screenshot.png")
-        self.driver.quit()
+        self.driver_quit()
 
 
     def __str__(self):
@@ -174,3 +317,6 @@ class CustomSelenium:
             Class name.
         """
         return self.__class__.__name__
+
+
+atexit.register(CustomSelenium.quit_pooled_drivers)
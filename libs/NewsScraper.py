@@ -1,21 +1,75 @@
 import re
+import io
 from pathlib import Path
 import logging
 from datetime import datetime
 import urllib.request
-from shutil import make_archive
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+import zipfile
 import pandas as pd
+from openpyxl import Workbook
+from lxml import etree
+import urllib3
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support.wait import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, TimeoutException, ElementClickInterceptedException
+from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException
 from libs.CustomSelenium import CustomSelenium
 from RPA.Robocorp.WorkItems import WorkItems
 from libs.Article import Article
 
 
+# Already compressed files, stored as they are in the archive instead of being deflated again
+_STORED_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+
+_LOCATOR_TYPES = {
+    "id": By.ID,
+    "xpath": By.XPATH,
+    "name": By.NAME,
+    "class": By.CLASS_NAME,
+    "css": By.CSS_SELECTOR,
+}
+
+_WAIT_CONDITIONS = (None, "presence", "clickable")
+
+# Article attributes written to the report, in column order
+_REPORT_COLUMNS = ["title", "date", "description", "image_file_name", "matches_count", "has_money"]
+
+# Seconds to wait for dynamic elements: the ones the scraping needs, and the ones that may never show up
+_ELEMENT_WAIT = 10
+_OPTIONAL_ELEMENT_WAIT = 5
+
+
+def archive_directory(directory: Path) -> Path:
+    """
+    Archives a directory into a ZIP file next to it, with the same name.
+
+    Images are already compressed, so they are stored as they are. Other files are deflated
+    with a fast compression level.
+
+    Parameters
+    ----------
+    directory : Path
+        The directory to archive.
+
+    Returns
+    -------
+    Path
+        The path of the ZIP file.
+    """
+    zip_path = directory.with_name(f"{directory.name}.zip")
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+        for file in sorted(directory.rglob("*")):
+            if not file.is_file():
+                continue
+            compress_type = zipfile.ZIP_STORED if file.suffix.lower() in _STORED_SUFFIXES else None
+            archive.write(file, file.relative_to(directory), compress_type=compress_type)
+    return zip_path
+
+
 class NewsScraper(CustomSelenium):
     """
     A web scraper for extracting articles from news websites using Selenium.
@@ -25,15 +79,19 @@ class NewsScraper(CustomSelenium):
 
     Attributes
     ----------
-    articles : list
-        List of collected articles during the scraping session.
+    articles_count : int
+        Number of articles collected and written to the report during the scraping session.
+    download_workers : int
+        Number of threads used to download article images concurrently.
+    http : urllib3.PoolManager
+        HTTP connection pool shared by all articles to download their images.
 
     Methods
     -------
     set_output_dir(output_dir: Path):
         Sets the directory where the scraped articles and other files will be saved.
     prepare_environment(browser: str = "Chrome"):
-        Prepares the environment, initializes the WebDriver, and creates output folders.
+        Prepares the environment, initializes the WebDriver, creates output folders and opens the report.
     access_home_page(url: str = "https://www.aljazeera.com/", screenshot: str = None):
         Accesses the homepage of the news website and optionally takes a screenshot.
     accept_cookies():
@@ -46,15 +104,15 @@ class NewsScraper(CustomSelenium):
         Sorts the search results by the specified option (date or relevance).
     close_ad_in_search_results():
         Closes any advertisements that appear in the search results.
-    load_more_articles():
-        Loads additional articles by clicking the "Load more" button.
-    explicitly_wait_for_show_more_button(timeout: int = 10):
-        Waits for the "Show more" button to appear before proceeding.
+    load_more_articles(search_results_element: WebElement, loaded_articles_count: int):
+        Loads additional articles by clicking the "Show more" button and waits for them to appear.
     create_report():
-        Generates a Excel report of the collected articles.
+        Saves the Excel report of the collected articles.
     archive_collection():
         Archives the output directory into a ZIP file.
-    _get_web_element(locator: str, locator_type: str = "xpath", parent: WebElement = None, multiple: bool = False) -> WebElement | list[WebElement]:
+    driver_quit():
+        Waits for pending image downloads and releases the web driver.
+    _get_web_element(locator: str, locator_type: str = "css", parent: WebElement = None, multiple: bool = False, optional: bool = False) -> WebElement | list[WebElement]:
         Retrieves a web element or a list of web elements based on the locator type and strategy.
     """
     def __init__(self):
@@ -63,8 +121,15 @@ class NewsScraper(CustomSelenium):
         """
         super().__init__()
         self.logger = logging.getLogger(__name__)
-        logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
-        self.articles = []
+        # Missing elements are reported right away, dynamic content is awaited with explicit waits
+        self.implicit_wait = 0
+        self.articles_count = 0
+        self._report: Workbook | None = None
+        self._report_sheet = None
+        self.download_workers = 8
+        self._download_pool: ThreadPoolExecutor | None = None
+        self._downloaded_files: set[str] = set()
+        self.http = urllib3.PoolManager(maxsize=16, block=False, headers={"User-Agent": self.user_agent})
 
 
     def set_output_dir(self, output_dir: Path):
@@ -81,7 +146,8 @@ class NewsScraper(CustomSelenium):
 
     def prepare_environment(self, browser: str = "Chrome"):
         """
-        Prepares the environment for scraping by setting up the WebDriver and creating necessary folders.
+        Prepares the environment for scraping by setting up the WebDriver, the image download threads,
+        creating necessary folders and opening the report.
 
         Parameters
         ----------
@@ -93,7 +159,12 @@ class NewsScraper(CustomSelenium):
             self.logger.info(f"Created output folder: {self.output_dir}")
 
         self.set_webdriver(browser)
-        self.set_page_size(1920, 1080)  # Set the window size to 1920x1080
+        self._download_pool = ThreadPoolExecutor(max_workers=self.download_workers)
+
+        # The report is written as the articles are collected, so they don't need to be kept in memory
+        self._report = Workbook(write_only=True)
+        self._report_sheet = self._report.create_sheet()
+        self._report_sheet.append(_REPORT_COLUMNS)
 
 
     def access_home_page(self, url: str = "https://www.aljazeera.com/", screenshot: str = None):
@@ -123,7 +194,16 @@ class NewsScraper(CustomSelenium):
         """
         Accepts the cookie consent pop-up on the homepage of the news website.
         """
-        accept_button = self._get_web_element("//button[@id='onetrust-accept-btn-handler']")
+        # The consent is remembered in a cookie, so a reused browser doesn't show the pop-up again
+        if self.driver.get_cookie("OptanonAlertBoxClosed"):
+            return
+
+        accept_button = self._get_web_element(
+            "#onetrust-accept-btn-handler",
+            explicit_wait=_OPTIONAL_ELEMENT_WAIT,
+            wait_condition="clickable",
+            optional=True,
+        )
         if accept_button:
             accept_button.click()
             self.logger.info("Accepted cookies.")
@@ -132,7 +212,7 @@ class NewsScraper(CustomSelenium):
     def collect_articles(self, search_term: str, number_of_months: int = 1):
         """
         Collects articles based on the provided search term and limits the results to the specified date range.
-        Articles are stored in the 'articles' list attribute.
+        Each article is written to the report as soon as it is collected.
 
         Parameters
         ----------
@@ -152,37 +232,96 @@ class NewsScraper(CustomSelenium):
         # Sometimes an ad pops up. Let's close it
         self.close_ad_in_search_results()
 
-        search_results_xpath = ".//div[@class='search-result__list']"
-        search_results_element = self._get_web_element(search_results_xpath)
+        # Image sources in the articles are relative to the search page
+        page_url = self.driver.current_url
 
-        list_of_articles_elements = self._get_web_element("//article", multiple=True, parent=search_results_element)
+        search_results_element = self._get_web_element("div.search-result__list", explicit_wait=_ELEMENT_WAIT)
 
-        while list_of_articles_elements:
-            article_element = list_of_articles_elements.pop(0)
-            # Make sure element is visible
-            self.driver.execute_script("arguments[0].scrollIntoView();", article_element)
-            current_article = Article(article_element, search_term, self.output_dir)
-
-            if current_article.date and current_article.date < limit_date:
-                break
+        articles_elements = self._iter_articles_elements(search_results_element, page_url)
+        loaded_articles_count = 0
+        download_futures: list[Future] = []
 
-            self.articles.append(current_article)
-            current_article.download_image()
-            self.logger.info(f"Collected article: {current_article.title}")
-
-            if len(list_of_articles_elements) == 0:
+        while True:
+            article_element = next(articles_elements, None)
+            if article_element is None:
                 # We reached the end of the page. Let's load more articles
-                success = self.load_more_articles()
+                success = self.load_more_articles(search_results_element, loaded_articles_count)
                 if not success:
                     # No more articles to load
                     break
 
-                # Get the new list of articles
-                list_of_articles_elements = self._get_web_element(
-                    ".//article", multiple=True, parent=search_results_element
+                # Get only the new articles, ignoring the ones that were already collected
+                articles_elements = self._iter_articles_elements(
+                    search_results_element, page_url, start=loaded_articles_count
                 )
-                # Ignore articles that were already collected
-                list_of_articles_elements = list_of_articles_elements[len(self.articles) :]
+                continue
+
+            loaded_articles_count += 1
+
+            # Only the date is read before checking the limit, the article is built once it's known to be kept
+            article_date = Article.parse_date(article_element)
+            if article_date and article_date < limit_date:
+                break
+
+            current_article = Article(article_element, search_term, self.output_dir, self.http)
+
+            self._report_sheet.append([getattr(current_article, column) for column in _REPORT_COLUMNS])
+            self.articles_count += 1
+            # The parsed HTML is no longer needed once the article is in the report
+            current_article.element = None
+            # Images are downloaded in the background while the next articles are collected,
+            # once per file since articles can share the same image
+            if current_article.image_url and current_article.image_file_name not in self._downloaded_files:
+                self._downloaded_files.add(current_article.image_file_name)
+                download_futures.append(self._download_pool.submit(current_article.download_image))
+            self.logger.info("Collected article: %s", current_article.title)
+
+        # Wait for the images of this search, raising any download error
+        for future in download_futures:
+            future.result()
+
+
+    def _iter_articles_elements(
+        self, search_results_element: WebElement, page_url: str, start: int = 0
+    ) -> Iterator[etree._Element]:
+        """
+        Reads the HTML of the articles in the search results and parses it locally with lxml, one article at a time.
+
+        The HTML of all the articles is transferred in a single driver call, so Selenium is only used to interact
+        with the page. The HTML is parsed incrementally and every article is discarded once the next one is
+        requested, so the parsed tree holds a single article rather than the whole batch. The HTML source
+        of the batch itself is kept, encoded once, until the articles are consumed.
+
+        Parameters
+        ----------
+        search_results_element : WebElement
+            The element containing the search results.
+        page_url : str
+            The URL of the search page, used to resolve relative links in the articles.
+        start : int, optional
+            Index of the first article to load, default is 0.
+
+        Yields
+        ------
+        etree._Element
+            The parsed article elements.
+        """
+        html = self.get_articles_html("article", parent=search_results_element, start=start)
+        if not html:
+            return
+
+        source = io.BytesIO(html.encode("utf-8"))
+        # Only the encoded copy is needed from here on
+        del html
+        for _, article_element in etree.iterparse(source, tag="article", html=True, encoding="utf-8"):
+            # Relative links in the article are resolved against the search page
+            article_element.getroottree().docinfo.URL = page_url
+            yield article_element
+
+            # Free the article, and the ones before it, once it has been processed
+            article_element.clear()
+            while article_element.getprevious() is not None:
+                del article_element.getparent()[0]
 
 
     def perform_search(self, search_term: str):
@@ -195,11 +334,15 @@ class NewsScraper(CustomSelenium):
             The term to search for in articles.
         """
         # Click on the search icon
-        search_icon = self._get_web_element("//div[@class='site-header__search-trigger']")
+        search_icon = self._get_web_element(
+            "div.site-header__search-trigger", explicit_wait=_ELEMENT_WAIT, wait_condition="clickable"
+        )
         search_icon.click()
 
         # enter the search term
-        search_bar = self._get_web_element(".//input[@class='search-bar__input']")
+        search_bar = self._get_web_element(
+            "input.search-bar__input", explicit_wait=_ELEMENT_WAIT, wait_condition="clickable"
+        )
         search_bar.send_keys(search_term)
 
         # Simulate enter key press
@@ -225,7 +368,9 @@ class NewsScraper(CustomSelenium):
         if by not in ["date", "relevance"]:
             raise ValueError(f"Sorting by '{by}' not supported.")
 
-        sort_by_option = self._get_web_element(".//option[@value='date']")
+        sort_by_option = self._get_web_element(
+            "option[value='date']", explicit_wait=_ELEMENT_WAIT, wait_condition="clickable"
+        )
         sort_by_option.click()
 
         logging.info(f"Sorted results by '{by}'.")
@@ -236,25 +381,46 @@ class NewsScraper(CustomSelenium):
         Closes a advertisement pop-up that appear in the bottom of search results
         and sometimes prevents interaction with the "Show more" button.
         """
+        add_close_button = self._get_web_element(
+            "button.ads__close-button",
+            explicit_wait=_OPTIONAL_ELEMENT_WAIT,
+            wait_condition="clickable",
+            optional=True,
+        )
+        if add_close_button is None:
+            self.logger.info("No add to close in search results.")
+            return
+
         try:
-            add_close_button = self._get_web_element("//button[@class='ads__close-button']")
             add_close_button.click()
             self.logger.info("Closed add in search results.")
-        except (NoSuchElementException, ElementClickInterceptedException):
-            self.logger.info("No add to close in search results.")
+        except ElementClickInterceptedException:
+            self.logger.info("Could not close the add in search results.")
 
 
-    def load_more_articles(self) -> bool:
+    def load_more_articles(self, search_results_element: WebElement, loaded_articles_count: int) -> bool:
         """
-        Clicks the "Show more" button to load additional articles.
+        Clicks the "Show more" button to load additional articles and waits until they are added to the results.
+
+        Parameters
+        ----------
+        search_results_element : WebElement
+            The element containing the search results.
+        loaded_articles_count : int
+            The number of articles in the search results before loading more.
 
         Returns
         -------
         bool
             True if more articles were loaded, False otherwise.
         """
-        show_more_button_xpath = "//button[@class='show-more-button grid-full-width']"
-        load_more_button = self._get_web_element(show_more_button_xpath)
+        show_more_button_selector = "button.show-more-button.grid-full-width"
+        load_more_button = self._get_web_element(
+            show_more_button_selector,
+            explicit_wait=_OPTIONAL_ELEMENT_WAIT,
+            wait_condition="clickable",
+            optional=True,
+        )
 
         if not load_more_button:
             self.logger.info("No 'Show more' button found.")
@@ -263,44 +429,79 @@ class NewsScraper(CustomSelenium):
         # Scroll to the button
         self.driver.execute_script("arguments[0].scrollIntoView();", load_more_button)
 
-        # Click the button
-        load_more_button.click()
+        # Click the button. An ad showing up after the search can still cover it, close it and try again
+        try:
+            load_more_button.click()
+        except ElementClickInterceptedException:
+            self.close_ad_in_search_results()
+            try:
+                load_more_button.click()
+            except ElementClickInterceptedException:
+                self.logger.error("'Show more' button is covered by another element.")
+                return False
         self.logger.info("Clicked 'Show more' button.")
 
-        # Explicitly wait for the page to load (button reappears)
-        self._get_web_element(show_more_button_xpath, explicit_wait=20, wait_condition="presence")
+        # Explicitly wait for the new articles to be added to the results. Only their count is read here,
+        # the new articles are then retrieved in a single call starting from the loaded articles count
+        try:
+            WebDriverWait(self.driver, 20).until(
+                lambda driver: self.count_elements("article", parent=search_results_element) > loaded_articles_count
+            )
+        except TimeoutException:
+            self.logger.info("No more articles loaded after clicking 'Show more' button.")
+            return False
 
         return True
 
     def create_report(self):
         """
-        Creates a CSV report of the collected articles.
+        Saves the Excel report of the collected articles.
 
         The report includes article titles, publication dates, descriptions, image file names,
         the number of matches for the search term, and whether money figure is present.
+        Its rows are written by collect_articles, this only saves the file. A write-only workbook can only be
+        saved once, so this is meant to be called after all the articles are collected and later calls do nothing.
         """
         report_file = self.output_dir / "report.xlsx"
-        report_df = pd.DataFrame([vars(article) for article in self.articles])
-        report_df = report_df[["title", "date", "description", "image_file_name", "matches_count", "has_money"]]
-        report_df.to_csv(self.output_dir / "report.csv", index=False)
-        report_df.to_excel(report_file, index=False)
+        if self._report is None:
+            self.logger.info(f"Report already saved to {report_file}")
+            return
+
+        self._report.save(report_file)
+        self._report = self._report_sheet = None
+        self.logger.info(f"Report with {self.articles_count} articles saved to {report_file}")
 
 
     def archive_collection(self):
         """
         Archives the output directory containing the collected articles and images into a ZIP file.
+
+        Images are already compressed, so they are stored as they are. Other files are deflated
+        with a fast compression level.
         """
-        zip_path = make_archive(self.output_dir, "zip", self.output_dir)
+        zip_path = archive_directory(self.output_dir)
         self.logger.info(f"Collection archived to {zip_path}")
 
+
+    def driver_quit(self):
+        """
+        Waits for pending image downloads to finish, then releases the web driver.
+        """
+        if self._download_pool:
+            self._download_pool.shutdown()
+            self._download_pool = None
+        super().driver_quit()
+
+
     def _get_web_element(
         self,
         locator: str,
-        locator_type: str = "xpath",
+        locator_type: str = "css",
         parent: WebElement = None,
         multiple: bool = False,
         explicit_wait: int = 0,
         wait_condition: str = None,
+        optional: bool = False,
     ) -> WebElement | list[WebElement]:
         """
         Retrieves a web element or a list of web elements using the specified locator strategy and criteria.
@@ -310,7 +511,7 @@ class NewsScraper(CustomSelenium):
         locator : str
             The locator string used to identify the web element(s).
         locator_type : str, optional
-            The type of locator to use ('xpath', 'id', 'name', 'class', or 'css'), default is 'xpath'.
+            The type of locator to use ('xpath', 'id', 'name', 'class', or 'css'), default is 'css'.
         parent : WebElement, optional
             The parent element to search within, default is None.
         multiple : bool, optional
@@ -319,6 +520,9 @@ class NewsScraper(CustomSelenium):
             The maximum time to wait for the element(s), default is 0 (no wait).
         wait_condition : str, optional
             The condition to wait for ('presence' or 'clickable'), default is 'presence'.
+        optional : bool, optional
+            If True, the element is not expected to always be on the page and a missing element
+            is not logged as an error, default is False.
 
         Returns
         -------
@@ -332,41 +536,34 @@ class NewsScraper(CustomSelenium):
         """
         parent = parent or self.driver
 
-        locator_types = {
-            "id": By.ID,
-            "xpath": By.XPATH,
-            "name": By.NAME,
-            "class": By.CLASS_NAME,
-            "css": By.CSS_SELECTOR,
-        }
-
-        by = locator_types.get(locator_type)
+        by = _LOCATOR_TYPES.get(locator_type)
         if by is None:
             raise ValueError(f"Unsupported locator type '{locator_type}'.")
 
-        valid_wait_conditions = [None, "presence", "clickable"]
-        if wait_condition not in valid_wait_conditions:
+        if wait_condition not in _WAIT_CONDITIONS:
             raise ValueError(
                 f"Invalid wait_condition '{wait_condition}'. Valid values are 'presence', 'clickable', or None."
             )
 
         wait_condition = wait_condition or "presence"
 
-        try:
-            if explicit_wait > 0:
-                condition = self._get_wait_condition(by, locator, wait_condition, multiple)
+        if explicit_wait > 0:
+            condition = self._get_wait_condition(by, locator, wait_condition, multiple)
+            try:
                 return WebDriverWait(parent, explicit_wait).until(condition)
-            else:
-                if multiple:
-                    elements = parent.find_elements(by, locator)
-                    if not elements:
-                        raise NoSuchElementException
-                    return elements
-                else:
-                    return parent.find_element(by, locator)
-        except (TimeoutException, NoSuchElementException):
-            self.logger.error(f"Element with locator '{locator}' not found.")
+            except TimeoutException:
+                if not optional:
+                    self.logger.error("Element with locator '%s' not found.", locator)
+                return None
+
+        # find_elements returns an empty list instead of raising when nothing is found,
+        # which spares building and catching a NoSuchElementException on every miss
+        elements = parent.find_elements(by, locator)
+        if not elements:
+            if not optional:
+                self.logger.error("Element with locator '%s' not found.", locator)
             return None
+        return elements if multiple else elements[0]
 
 
 
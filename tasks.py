@@ -1,3 +1,4 @@
+import logging
 from robocorp.tasks import task
 from robocorp import workitems
 from robocorp.tasks import get_output_dir
@@ -7,6 +8,8 @@ from libs.NewsScraper import NewsScraper
 OUTPUT_DIR = get_output_dir()
 TARGET_WEBSITE = "https://www.aljazeera.com/"
 
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
 @task
 def make_aljazeera_news_report():
 
@@ -14,17 +17,23 @@ def make_aljazeera_news_report():
     try:
         scraper.set_output_dir(OUTPUT_DIR / "aljazeera_news")
         scraper.prepare_environment(browser="Chrome")
-        scraper.access_home_page(TARGET_WEBSITE)
-        
+
+        # Only one input work item can be reserved at a time, so each one is scraped while it's reserved
+        # and released as done or failed depending on its own result
         for item in workitems.inputs:
             search_phrase = item.payload.get("search_phrase", "Science")
             number_of_months = item.payload.get("number_of_months", 1)
             scraper.logger.info(f"Collected workitems: {search_phrase}, {number_of_months}")
-            scraper.collect_articles(search_phrase, number_of_months=number_of_months)
+            try:
+                # Start every search from the home page, whatever page the previous one ended on
+                scraper.access_home_page(TARGET_WEBSITE)
+                scraper.collect_articles(search_phrase, number_of_months=number_of_months)
+            except Exception as error:
+                scraper.logger.exception(f"Work item '{search_phrase}' failed.")
+                item.fail(exception_type=workitems.ExceptionType.APPLICATION, message=str(error))
 
         scraper.create_report()
         scraper.archive_collection()
 
     finally:
         scraper.driver_quit()
-